@@ -14,11 +14,12 @@ router = APIRouter(prefix="/structure", tags=["structuring"])
 def structure(doc_id: str):
     t0 = time.time()
     try:
-        # 1) Get processed bucket/prefix from DB
+        # 1) Get processed bucket/prefix + doc_type from DB (single round-trip)
         with engine.begin() as conn:
             row = conn.execute(
                 sa.select(
                     documents.c.id,
+                    documents.c.doc_type,
                     documents.c.processed_bucket,
                     documents.c.processed_prefix,
                 ).where(documents.c.id == doc_id)
@@ -29,6 +30,7 @@ def structure(doc_id: str):
 
         processed_bucket = row["processed_bucket"]
         processed_prefix = row["processed_prefix"]
+        doc_type = row["doc_type"] or "unknown"
 
         # 2) Read extracted.txt (required)
         txt_key = f"{processed_prefix}extracted/extracted.txt"
@@ -62,6 +64,7 @@ def structure(doc_id: str):
             extracted_markdown=extracted_markdown,
             processed_prefix=processed_prefix,
             processed_bucket=processed_bucket,
+            doc_type=doc_type,
         )
 
         PIPELINE_STEP_TOTAL.labels(step="structure", result="success").inc()
@@ -21,6 +21,7 @@ from app.api.search import router as search_router
 from app.api.structure import router as structure_router
 from app.core.settings import settings
 from app.services.db_service import init_db
+from app.services.tracing import register_step
 
 # ✅ Metrics service
 from app.services.metrics_service import (
@@ -101,6 +102,16 @@ async def lifespan(app: FastAPI):
     # ✅ Tracing OpenTelemetry
     init_tracing()
 
+    # métriques pipeline_step_* des étapes principales liées dès le démarrage
+    register_step(
+        "process.extract",
+        "structure.normalize",
+        "structure.route",
+        "structure.build_payload",
+        "structure.upload_structured",
+        "index.document",
+    )
+
     # Auto-instrument FastAPI + requests
     # (exclude /metrics to avoid noise)
     FastAPIInstrumentor.instrument_app(
@@ -1,11 +1,31 @@
 from __future__ import annotations
 import re
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 from app.services.tracing import span_step
+from app.services.keyword_matcher import KeywordMatcher
 from app.services.structuring_service import extract_skills_from_text
 
 
+# regex compilées une fois à l'import (appelées pour chaque AMI)
+_RX_EMAIL = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
+_RX_DEADLINE_PHRASE = re.compile(r"(avant le|au plus tard le)\s+(.{0,80}?)(?:\n|\.|;)", re.IGNORECASE)
+_RX_DEADLINE_DATE = re.compile(
+    r"\b(le)\s+\d{1,2}\s+[A-Za-zéèêàûîôç]+\s+\d{4}\s+(à|a)\s+\d{1,2}\s*h?\s*\d{0,2}",
+    re.IGNORECASE,
+)
+_RX_NUMBERED_ITEM = re.compile(r"(?m)^\s*(\d{1,2})\s*[.\-–]\s+(.+)$")
+_RX_BULLET_ITEM = re.compile(r"(?m)^\s*[▪•\-–]\s+(.+)$")
+_RX_WHITESPACE = re.compile(r"\s+")
+
+
+# listes de marqueurs constantes: un matcher (une passe pour tous les marqueurs) par liste
+@lru_cache(maxsize=64)
+def _marker_matcher(markers: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(m.lower() for m in markers)
+
+
 def _extract_between(
     text: str,
     start_markers: List[str],
@@ -16,29 +36,19 @@ def _extract_between(
         t = text or ""
         low = t.lower()
 
-        starts = []
-        for m in start_markers:
-            p = low.find(m.lower())
-            if p != -1:
-                starts.append(p)
-        if not starts:
+        start = _marker_matcher(tuple(start_markers)).first_start(low)
+        if start == -1:
             return ""
 
-        start = min(starts)
+        end_pos = _marker_matcher(tuple(end_markers)).first_start(low, start + 10)
 
-        end_pos = None
-        for em in end_markers:
-            p = low.find(em.lower(), start + 10)
-            if p != -1:
-                end_pos = p if end_pos is None else min(end_pos, p)
-
-        end = end_pos if end_pos is not None else min(len(t), start + max_len)
+        end = end_pos if end_pos != -1 else min(len(t), start + max_len)
         return t[start:end].strip()
 
 
 def extract_emails(text: str) -> list[str]:
     with span_step("structure.ami.extract_emails"):
-        return sorted(set(re.findall(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}", text or "")))
+        return sorted(set(_RX_EMAIL.findall(text or "")))
 
 
 def extract_selection_method(text: str) -> str:
@@ -55,19 +65,11 @@ def extract_deadline(text: str) -> str:
     with span_step("structure.ami.extract_deadline"):
         t = text or ""
 
-        m = re.search(
-            r"(avant le|au plus tard le)\s+(.{0,80}?)(?:\n|\.|;)",
-            t,
-            flags=re.IGNORECASE,
-        )
+        m = _RX_DEADLINE_PHRASE.search(t)
         if m:
             return m.group(0).strip()
 
-        m = re.search(
-            r"\b(le)\s+\d{1,2}\s+[A-Za-zéèêàûîôç]+\s+\d{4}\s+(à|a)\s+\d{1,2}\s*h?\s*\d{0,2}",
-            t,
-            flags=re.IGNORECASE,
-        )
+        m = _RX_DEADLINE_DATE.search(t)
         return m.group(0).strip() if m else ""
 
 
@@ -77,17 +79,17 @@ def extract_services_list(text: str, max_items: int = 30) -> list[str]:
         items = []
         seen = set()
 
-        for m in re.finditer(r"(?m)^\s*(\d{1,2})\s*[.\-–]\s+(.+)$", t):
+        for m in _RX_NUMBERED_ITEM.finditer(t):
             s = m.group(2).strip()
-            s = re.sub(r"\s+", " ", s)
+            s = _RX_WHITESPACE.sub(" ", s)
             if 5 <= len(s) <= 220 and s.lower() not in seen:
                 seen.add(s.lower())
                 items.append(s)
 
         if len(items) < 3:
-            for m in re.finditer(r"(?m)^\s*[▪•\-–]\s+(.+)$", t):
+            for m in _RX_BULLET_ITEM.finditer(t):
                 s = m.group(1).strip()
-                s = re.sub(r"\s+", " ", s)
+                s = _RX_WHITESPACE.sub(" ", s)
                 if 5 <= len(s) <= 220 and s.lower() not in seen:
                     seen.add(s.lower())
                     items.append(s)
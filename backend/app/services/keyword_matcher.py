@@ -0,0 +1,118 @@
+# backend/app/services/keyword_matcher.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:  # dépendance optionnelle: fallback sur des str.find
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Recherche d'un ensemble fixe de mots-clés en une seule passe (Aho-Corasick).
+    Construit une fois (niveau module), puis réutilisé pour chaque document.
+
+    Les mots-clés sont comparés tels quels: passer un texte déjà normalisé
+    (ex: en minuscules) de la même façon que les mots-clés. Comme pour str.find,
+    un mot-clé vide est présent en position 0 de tout texte.
+    Sans pyahocorasick (ou avec un seul mot-clé), on fait un scan par mot-clé (même résultat).
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        keywords = list(dict.fromkeys(keywords))
+        self._has_empty = "" in keywords
+        self.keywords: List[str] = [k for k in keywords if k]
+        self._max_len = max((len(k) for k in self.keywords), default=0)
+
+        self._automaton = None
+        if ahocorasick is not None and len(self.keywords) > 1:
+            automaton = ahocorasick.Automaton()
+            for k in self.keywords:
+                automaton.add_word(k, k)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def iter(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        (start, keyword) pour chaque occurrence, chevauchements inclus.
+        Avec l'automate, les occurrences sortent triées par position de fin.
+        """
+        if not text:
+            return
+        if self._automaton is not None:
+            for end, k in self._automaton.iter(text):
+                yield end - len(k) + 1, k
+            return
+        for k in self.keywords:
+            p = text.find(k)
+            while p != -1:
+                yield p, k
+                p = text.find(k, p + 1)
+
+    def search(self, text: str) -> bool:
+        """True si au moins un mot-clé apparaît dans le texte."""
+        if self._has_empty:
+            return True
+        if not text:
+            return False
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return any(k in text for k in self.keywords)
+
+    def found(self, text: str) -> Set[str]:
+        """Ensemble des mots-clés présents dans le texte."""
+        out: Set[str] = {""} if self._has_empty else set()
+        if not text:
+            return out
+        if self._automaton is not None:
+            out.update(k for _, k in self._automaton.iter(text))
+        else:
+            out.update(k for k in self.keywords if k in text)
+        return out
+
+    def first_starts(self, text: str) -> Dict[str, int]:
+        """
+        Position de la première occurrence de chaque mot-clé présent (comme str.find),
+        en une seule passe. Les mots-clés absents n'ont pas d'entrée.
+        """
+        out: Dict[str, int] = {"": 0} if self._has_empty else {}
+        if not text:
+            return out
+        if self._automaton is not None:
+            # occurrences triées par fin: pour un mot-clé donné, la première vue est la plus à gauche
+            n = len(out) + len(self.keywords)
+            for end, k in self._automaton.iter(text):
+                if k not in out:
+                    out[k] = end - len(k) + 1
+                    if len(out) == n:
+                        break
+            return out
+        for k in self.keywords:
+            p = text.find(k)
+            if p != -1:
+                out[k] = p
+        return out
+
+    def first_start(self, text: str, start: int = 0) -> int:
+        """
+        Position de début de la première occurrence (tous mots-clés confondus), -1 sinon.
+        start (>= 0): comme str.find(k, start), seules les occurrences débutant à partir de start comptent.
+        """
+        if self._has_empty:
+            return start if start <= len(text or "") else -1
+        if not text or start >= len(text):
+            return -1
+        if self._automaton is not None:
+            best = -1
+            for end, k in self._automaton.iter(text, start):
+                # occurrences triées par fin: au-delà, aucun début ne peut être plus petit
+                if best != -1 and end - self._max_len + 1 >= best:
+                    break
+                s = end - len(k) + 1
+                if best == -1 or s < best:
+                    best = s
+            return best
+        positions = [p for p in (text.find(k, start) for k in self.keywords) if p != -1]
+        return min(positions) if positions else -1
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
 
@@ -35,6 +36,12 @@ def _norm(s: str) -> str:
     s = re.sub(r"\s+", " ", s).strip()
     return s
 
+# mots-clés, marqueurs et mois: chaînes courtes qui reviennent à chaque document
+# (pas de cache sur _norm: il reçoit aussi les textes complets)
+@lru_cache(maxsize=2048)
+def _norm_kw(s: str) -> str:
+    return _norm(s)
+
 def _first_match(regex: str, text: str, flags: int = re.IGNORECASE) -> Optional[re.Match]:
     return re.search(regex, text, flags=flags)
 
@@ -49,7 +56,9 @@ FR_MARKERS = ["le", "la", "les", "des", "pour", "avec", "dans", "afin", "minist
 EN_MARKERS = ["the", "and", "for", "with", "within", "background", "scope of work", "terms of reference", "deadline"]
 
 def detect_language(text: str) -> Optional[str]:
-    t = _norm(text)
+    return _detect_language(_norm(text))
+
+def _detect_language(t: str) -> Optional[str]:
     if not t:
         return None
     fr = sum(1 for w in FR_MARKERS if w in t)
@@ -73,10 +82,12 @@ BAILLEURS = [
 ]
 
 def detect_bailleur(text: str) -> Optional[str]:
-    t = _norm(text)
+    return _detect_bailleur(_norm(text))
+
+def _detect_bailleur(t: str) -> Optional[str]:
     for canon, kws in BAILLEURS:
         for kw in kws:
-            if _norm(kw) in t:
+            if _norm_kw(kw) in t:
                 return canon
     return None
 
@@ -102,11 +113,13 @@ REGIONS = [
 ]
 
 def detect_pays_region(text: str) -> tuple[Optional[str], Optional[str]]:
-    t = _norm(text)
+    return _detect_pays_region(_norm(text))
+
+def _detect_pays_region(t: str) -> tuple[Optional[str], Optional[str]]:
     found_country = None
     for canon, kws in PAYS:
         for kw in kws:
-            if _norm(kw) in t:
+            if _norm_kw(kw) in t:
                 found_country = canon
                 break
         if found_country:
@@ -115,7 +128,7 @@ def detect_pays_region(text: str) -> tuple[Optional[str], Optional[str]]:
     found_region = None
     for canon, kws in REGIONS:
         for kw in kws:
-            if _norm(kw) in t:
+            if _norm_kw(kw) in t:
                 found_region = canon
                 break
         if found_region:
@@ -139,7 +152,7 @@ PUBLICATION_MARKERS = ["publié", "publication", "paru", "date:"]
 
 def _parse_fr_date(match: re.Match) -> Optional[str]:
     d = int(match.group(1))
-    mtxt = _norm(match.group(2))
+    mtxt = _norm_kw(match.group(2))
     y = int(match.group(3))
     m = MONTHS_FR.get(mtxt)
     if not m:
@@ -175,6 +188,9 @@ def _extract_best_date(text: str) -> list[str]:
     return out
 
 def detect_dates(text: str) -> Dict[str, Optional[str]]:
+    return _detect_dates(text, _norm(text))
+
+def _detect_dates(text: str, lower: str) -> Dict[str, Optional[str]]:
     t = text or ""
     dates = _extract_best_date(t)
 
@@ -182,11 +198,10 @@ def detect_dates(text: str) -> Dict[str, Optional[str]]:
     deadline = None
     publication = None
 
-    lower = _norm(t)
     if dates:
         # on essaye d’assigner deadline via window autour de marker
         for marker in DEADLINE_MARKERS:
-            pos = lower.find(_norm(marker))
+            pos = lower.find(_norm_kw(marker))
             if pos != -1:
                 window = t[pos: min(pos + 600, len(t))]
                 dwin = _extract_best_date(window)
@@ -196,7 +211,7 @@ def detect_dates(text: str) -> Dict[str, Optional[str]]:
 
         # publication via marker
         for marker in PUBLICATION_MARKERS:
-            pos = lower.find(_norm(marker))
+            pos = lower.find(_norm_kw(marker))
             if pos != -1:
                 window = t[pos: min(pos + 600, len(t))]
                 dwin = _extract_best_date(window)
@@ -227,10 +242,12 @@ DOMAINS = [
 ]
 
 def detect_domaine(text: str) -> Optional[str]:
-    t = _norm(text)
+    return _detect_domaine(_norm(text))
+
+def _detect_domaine(t: str) -> Optional[str]:
     for canon, kws in DOMAINS:
         for kw in kws:
-            if _norm(kw) in t:
+            if _norm_kw(kw) in t:
                 return canon
     return None
 
@@ -243,11 +260,13 @@ def extract_metadata(text: str) -> Dict[str, Any]:
     Extraction V1 (rules-based).
     Retourne le schéma attendu par ton structured.json.
     """
-    lang = detect_language(text)
-    bailleur = detect_bailleur(text)
-    pays, region = detect_pays_region(text)
-    dates = detect_dates(text)
-    domaine = detect_domaine(text)
+    # texte normalisé une seule fois, partagé par tous les détecteurs
+    t = _norm(text)
+    lang = _detect_language(t)
+    bailleur = _detect_bailleur(t)
+    pays, region = _detect_pays_region(t)
+    dates = _detect_dates(text, t)
+    domaine = _detect_domaine(t)
 
     return {
         "langue": lang,
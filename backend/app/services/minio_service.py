@@ -1,10 +1,14 @@
 from minio import Minio
 from app.core.settings import settings
 from pathlib import Path
+from typing import Optional
+import gzip
 import io
 
 from app.services.tracing import span_step
 
+GZIP_MAGIC = b"\x1f\x8b"
+
 
 def get_minio_client() -> Minio:
     endpoint = settings.minio_endpoint.replace("http://", "").replace("https://", "")
@@ -79,6 +83,40 @@ def upload_text(
         )
 
 
+def upload_bytes(
+    bucket: str,
+    object_name: str,
+    data: bytes,
+    content_type: str = "application/json",
+    client: Optional[Minio] = None,
+    content_encoding: Optional[str] = None,
+):
+    """
+    Upload de bytes déjà encodés (ex: orjson.dumps) en MinIO.
+    Évite la copie str -> bytes de upload_text pour les gros JSON.
+    client: client partagé (traitements par lot), sinon un nouveau client.
+    content_encoding: ex "gzip" si data est déjà compressé.
+    """
+    data = data or b""
+    with span_step(
+        "minio.upload_bytes",
+        bucket=bucket,
+        object_key=object_name,
+        content_type=content_type,
+        content_encoding=content_encoding,
+        bytes_len=len(data),
+    ):
+        client = client or get_minio_client()
+        client.put_object(
+            bucket,
+            object_name,
+            io.BytesIO(data),
+            length=len(data),
+            content_type=content_type,
+            metadata={"Content-Encoding": content_encoding} if content_encoding else None,
+        )
+
+
 def upload_markdown(bucket: str, object_name: str, markdown: str):
     """
     Helper dédié Markdown (Docling -> extracted.md)
@@ -100,6 +138,10 @@ def download_text(bucket: str, object_name: str) -> str:
             resp = client.get_object(bucket, object_name)
             raw = resp.read()
 
+            # 0) objets compressés (Content-Encoding: gzip), si pas déjà décodés par le client HTTP
+            if raw[:2] == GZIP_MAGIC:
+                raw = gzip.decompress(raw)
+
             # 1) try utf-8 strict
             try:
                 return raw.decode("utf-8")
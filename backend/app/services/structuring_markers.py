@@ -0,0 +1,37 @@
+# backend/app/services/structuring_markers.py
+from __future__ import annotations
+
+from app.services.keyword_matcher import KeywordMatcher
+
+
+# Marqueurs d'un dossier d'appel d'offres (comparés sur le texte en minuscules)
+PROCUREMENT_MARKERS = [
+    "appel d'offre",
+    "appel d’offres",
+    "dao",
+    "dossier d'appel d'offres",
+    "dossier d’appel d’offres",
+    "offre technique",
+    "offre financière",
+    "offre financiere",
+    "soumission",
+    "marché",
+    "marche",
+    "lot",
+    "dossier administratif",
+]
+
+# construit une fois à l'import: un seul scan du texte pour tous les marqueurs
+PROCUREMENT_MATCHER = KeywordMatcher(PROCUREMENT_MARKERS)
+
+
+def looks_like_procurement(lower_text: str) -> bool:
+    # attend un texte déjà en minuscules (calculé une fois par l'appelant)
+    return PROCUREMENT_MATCHER.search(lower_text)
+
+
+__all__ = [
+    "PROCUREMENT_MARKERS",
+    "PROCUREMENT_MATCHER",
+    "looks_like_procurement",
+]
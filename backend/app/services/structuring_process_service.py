@@ -1,14 +1,23 @@
 # backend/app/services/structuring_process_service.py
-import json
+import gzip
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+import orjson
 import sqlalchemy as sa
-from typing import Optional, Dict, Any
 
-from app.services.tracing import span_step
+from app.services.tracing import span_step, submit_in_context
 from app.services.db_service import engine, documents
-from app.services.minio_service import upload_text
+from app.services.minio_service import upload_bytes, get_minio_client
+from app.services.text_cache import TextLRU, text_key
 
 from app.services.structuring_service import (
+    SECTION_KEYS,
     split_into_sections,
+    batch_structure,
+    BATCH_MIN_POOL_CHARS,
     extract_tasks,
     extract_skills_from_text,
     normalize_text,
@@ -17,29 +26,63 @@ from app.services.structuring_service import (
 )
 
 from app.services.structuring_router import route_structuring
+from app.services.structuring_markers import looks_like_procurement
 from app.services.metadata_service import extract_metadata
 
+log = logging.getLogger("uvicorn.error")
+
+
+# En dessous, pas assez de contenu pour une liste de compétences (avis courts, formulaires)
+_MIN_SKILLS_TEXT_LEN = 200
+
+# Ordre de priorité des sections utilisées comme source des tâches
+_TASK_SOURCE_SECTIONS = ("taches", "taches_table", "mission", "livrables", "competences")
+
+
+# Au-delà, le JSON structuré est compressé (gzip) avant upload
+_GZIP_MIN_BYTES = 64 * 1024
+
+# Schéma stable du payload structuré (ordre des clés conservé dans le JSON)
+_METADATA_DEFAULTS: Dict[str, Any] = {
+    "langue": None,
+    "domaine": None,
+    "bailleur": None,
+    "pays": None,
+    "region": None,
+    "dates": {"publication": None, "deadline": None},
+}
+
 
-PROCUREMENT_MARKERS = [
-    "appel d'offre",
-    "appel d’offres",
-    "dao",
-    "dossier d'appel d'offres",
-    "dossier d’appel d’offres",
-    "offre technique",
-    "offre financière",
-    "offre financiere",
-    "soumission",
-    "marché",
-    "marche",
-    "lot",
-    "dossier administratif",
-]
+# -------------------------
+# Cache (re-structuration du même texte: retries, relances pipeline)
+# split_into_sections a son propre cache (structuring_service)
+# -------------------------
+_SKILLS_CACHE = TextLRU(maxsize=128)
 
 
-def _looks_like_procurement(text: str) -> bool:
-    lower = (text or "").lower()
-    return any(m in lower for m in PROCUREMENT_MARKERS)
+def _extract_skills_cached(normalized: str, lower: str) -> List[str]:
+    skills, _ = _SKILLS_CACHE.get_or_compute(
+        text_key(normalized),
+        lambda: tuple(extract_skills_from_text(normalized, lower=lower)),
+    )
+    return list(skills)
+
+
+def _extract_skills_step(doc_id: str, normalized: str, lower: str) -> List[str]:
+    with span_step("structure.extract_competences_list", doc_id=doc_id, norm_len=len(normalized or "")):
+        return _extract_skills_cached(normalized, lower)
+
+
+def _extract_metadata_step(doc_id: str, normalized: str) -> Dict[str, Any]:
+    with span_step("structure.metadata", doc_id=doc_id, norm_len=len(normalized or "")) as span:
+        metadata = extract_metadata(normalized)
+        # attributs utiles mais légers
+        span.set_attribute("meta.langue", metadata.get("langue"))
+        span.set_attribute("meta.domaine", metadata.get("domaine"))
+        span.set_attribute("meta.pays", metadata.get("pays"))
+        span.set_attribute("meta.region", metadata.get("region"))
+        span.set_attribute("meta.bailleur", metadata.get("bailleur"))
+    return metadata
 
 
 def _structure_tdr_like(
@@ -48,12 +91,16 @@ def _structure_tdr_like(
     extracted_markdown: Optional[str],
 ) -> Dict[str, Any]:
     with span_step("structure.tdr_like", doc_id=doc_id, norm_len=len(normalized or ""), md_len=len(extracted_markdown or "")):
+        # une seule copie en minuscules, réutilisée pour les tests insensibles à la casse
+        # (compétences, marqueurs procurement, fallback procurement)
+        lower = (normalized or "").lower()
+
         # 1) Split sections
         with span_step("structure.split_sections", doc_id=doc_id):
             sections = split_into_sections(normalized)
 
-        # 2) TABLE-FIRST enrich (AVANT tâches)
-        if extracted_markdown and extracted_markdown.strip():
+        # 2) TABLE-FIRST enrich (AVANT tâches) - pas de "|" => aucune table markdown
+        if extracted_markdown and "|" in extracted_markdown:
             with span_step("structure.enrich_tables", doc_id=doc_id):
                 sections = enrich_sections_from_markdown_tables(
                     sections=sections,
@@ -61,26 +108,29 @@ def _structure_tdr_like(
                 )
 
         # 3) Extraction taches (liste) - source prioritaire
-        source_for_tasks = (
-            (sections.get("taches") or "").strip()
-            or (sections.get("taches_table") or "").strip()
-            or (sections.get("mission") or "").strip()
-            or (sections.get("livrables") or "").strip()
-            or (sections.get("competences") or "").strip()
-            or normalized
-        )
+        # (pas de .strip() sur les sections écartées: extract_tasks strippe chaque ligne)
+        for k in _TASK_SOURCE_SECTIONS:
+            v = sections.get(k)
+            if v and not v.isspace():
+                source_for_tasks = v
+                break
+        else:
+            source_for_tasks = normalized
 
         with span_step("structure.extract_tasks_list", doc_id=doc_id, source_len=len(source_for_tasks or "")):
             taches_list = extract_tasks(source_for_tasks)
 
         # 4) competences keywords (liste)
-        with span_step("structure.extract_competences_list", doc_id=doc_id, norm_len=len(normalized or "")):
-            competences_list = extract_skills_from_text(normalized)
+        competences_list = (
+            _extract_skills_step(doc_id, normalized, lower)
+            if len(normalized or "") >= _MIN_SKILLS_TEXT_LEN
+            else []
+        )
 
         # 5) procurement fallback seulement si markers
-        if _looks_like_procurement(normalized):
+        if looks_like_procurement(lower):
             with span_step("structure.procurement_fallback_apply", doc_id=doc_id):
-                sections = procurement_fallback(normalized, sections, taches_list)
+                sections = procurement_fallback(normalized, sections, taches_list, lower=lower)
 
         return {
             "doc_type": "tdr",
@@ -91,55 +141,62 @@ def _structure_tdr_like(
         }
 
 
+def _structure_ami(
+    doc_id: str,
+    normalized: str,
+    extracted_markdown: Optional[str],
+) -> Dict[str, Any]:
+    return route_structuring("ami", normalized)
+
+
+# doc_type -> structuration (défaut: logique TDR pour tdr/unknown/other/...)
+_ROUTES: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "ami": _structure_ami,
+}
+
+
 def structure_document(
     doc_id: str,
     extracted_text: str,
     processed_prefix: str,
     extracted_markdown: Optional[str],
     processed_bucket: str,
+    doc_type: Optional[str] = None,
+    minio_client: Any = None,
+    pretty: bool = False,
+    normalized: Optional[str] = None,
 ) -> str:
-    # 0) doc_type depuis DB
-    with span_step("structure.load_doc_type", doc_id=doc_id):
-        with engine.begin() as conn:
-            row = conn.execute(
-                sa.select(documents.c.id, documents.c.doc_type).where(documents.c.id == doc_id)
-            ).mappings().first()
-            if not row:
-                raise ValueError("doc_id not found in documents table")
-            doc_type = (row.get("doc_type") or "unknown").lower()
-
-    # 1) Normalisation
-    with span_step("structure.normalize", doc_id=doc_id, in_len=len(extracted_text or "")) as span:
-        normalized = normalize_text(extracted_text)
-        span.set_attribute("out_len", len(normalized or ""))
+    # 0) doc_type: fourni par l'appelant (déjà lu avec bucket/prefix), sinon depuis DB
+    if doc_type is None:
+        with span_step("structure.load_doc_type", doc_id=doc_id):
+            with engine.begin() as conn:
+                row = conn.execute(
+                    sa.select(documents.c.id, documents.c.doc_type).where(documents.c.id == doc_id)
+                ).mappings().first()
+                if not row:
+                    raise ValueError("doc_id not found in documents table")
+                doc_type = row.get("doc_type")
+
+    doc_type = (doc_type or "unknown").lower()
+
+    # 1) Normalisation (normalized: déjà calculé par l'appelant, ex: structure_documents)
+    if normalized is None:
+        with span_step("structure.normalize", doc_id=doc_id, in_len=len(extracted_text or "")) as span:
+            normalized = normalize_text(extracted_text)
+            span.set_attribute("out_len", len(normalized or ""))
 
     # 2) Routage
     with span_step("structure.route", doc_id=doc_id, doc_type=doc_type) as span:
-        if doc_type == "ami":
-            result = route_structuring("ami", normalized)
-        elif doc_type in ("tdr", "unknown", "other"):
-            result = _structure_tdr_like(
-                doc_id=doc_id,
-                normalized=normalized,
-                extracted_markdown=extracted_markdown,
-            )
-        else:
-            result = _structure_tdr_like(
-                doc_id=doc_id,
-                normalized=normalized,
-                extracted_markdown=extracted_markdown,
-            )
+        handler = _ROUTES.get(doc_type, _structure_tdr_like)
+        result = handler(
+            doc_id=doc_id,
+            normalized=normalized,
+            extracted_markdown=extracted_markdown,
+        )
         span.set_attribute("result.doc_type", (result.get("doc_type") or doc_type))
 
     # 3) Metadata
-    with span_step("structure.metadata", doc_id=doc_id, norm_len=len(normalized or "")) as span:
-        metadata = extract_metadata(normalized)
-        # attributs utiles mais légers
-        span.set_attribute("meta.langue", metadata.get("langue"))
-        span.set_attribute("meta.domaine", metadata.get("domaine"))
-        span.set_attribute("meta.pays", metadata.get("pays"))
-        span.set_attribute("meta.region", metadata.get("region"))
-        span.set_attribute("meta.bailleur", metadata.get("bailleur"))
+    metadata = _extract_metadata_step(doc_id, normalized)
 
     sections = result.get("sections") or {}
 
@@ -148,26 +205,10 @@ def structure_document(
         payload = {
             "doc_id": doc_id,
             "doc_type": result.get("doc_type", doc_type),
-            "metadata": {
-                "langue": metadata.get("langue"),
-                "domaine": metadata.get("domaine"),
-                "bailleur": metadata.get("bailleur"),
-                "pays": metadata.get("pays"),
-                "region": metadata.get("region"),
-                "dates": metadata.get("dates", {"publication": None, "deadline": None}),
-            },
-            "sections": {
-                "contexte": sections.get("contexte", ""),
-                "mission": sections.get("mission", ""),
-                "taches": sections.get("taches", ""),
-                "livrables": sections.get("livrables", ""),
-                "planning": sections.get("planning", ""),
-                "profil": sections.get("profil", ""),
-                "competences": sections.get("competences", ""),
-                "evaluation": sections.get("evaluation", ""),
-                "candidature": sections.get("candidature", ""),
-                "taches_table": sections.get("taches_table", ""),
-            },
+            # extract_metadata renvoie exactement ces clés: une seule fusion
+            "metadata": {**_METADATA_DEFAULTS, **metadata},
+            # sections: clés fixes du schéma, "" si absente
+            "sections": {k: sections.get(k, "") for k in SECTION_KEYS},
             "competences": result.get("competences") or [],
             "taches": result.get("taches") or [],
             "ami_fields": result.get("ami_fields"),
@@ -180,14 +221,105 @@ def structure_document(
     else:
         key = f"{processed_prefix}structured/tdr_structured.json"
 
+    # JSON compact (consommé par machine); pretty=True pour le debug.
+    # Sérialisé une seule fois: la taille sert aussi d'attribut de span.
+    body = orjson.dumps(payload, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(payload)
+
     with span_step(
         "structure.upload_structured",
         doc_id=doc_id,
         bucket=processed_bucket,
         object_key=key,
         doc_type=out_doc_type,
-        json_len=len(json.dumps(payload, ensure_ascii=False)),
-    ):
-        upload_text(processed_bucket, key, json.dumps(payload, ensure_ascii=False, indent=2))
+        json_len=len(body),
+    ) as span:
+        content_encoding = None
+        if len(body) >= _GZIP_MIN_BYTES:
+            # mtime=0: même payload -> mêmes octets
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            content_encoding = "gzip"
+            span.set_attribute("gzip_len", len(body))
+        upload_bytes(processed_bucket, key, body, client=minio_client, content_encoding=content_encoding)
 
     return key
+
+
+# -------------------------
+# Traitement par lot
+# -------------------------
+_BATCH_MAX_WORKERS = 4
+
+# au plus autant de textes que le cache de split_into_sections peut en garder (128),
+# avec de la marge pour les autres requêtes: sinon les premiers seraient évincés avant usage
+_BATCH_PRESPLIT_MAX = 64
+# et au moins BATCH_MIN_POOL_CHARS caractères (structuring_service, ~2 millions) sur une
+# machine multi-cœurs: en dessous, le démarrage du pool de processus coûte plus qu'il ne rapporte
+
+# (doc_id, extracted_text, processed_prefix, extracted_markdown, processed_bucket)
+StructureItem = Tuple[str, str, str, Optional[str], str]
+
+
+def structure_documents(items: List[StructureItem]) -> List[str]:
+    """
+    Structure un lot de documents:
+    - un seul SELECT (WHERE id IN ...) pour tous les doc_type
+    - un seul client MinIO partagé pour les uploads
+    - documents traités en parallèle (clés retournées dans l'ordre des items)
+    """
+    if not items:
+        return []
+
+    doc_ids = [it[0] for it in items]
+
+    with span_step("structure.batch", batch_size=len(items)):
+        with span_step("structure.load_doc_types", batch_size=len(items)):
+            with engine.begin() as conn:
+                rows = conn.execute(
+                    sa.select(documents.c.id, documents.c.doc_type).where(documents.c.id.in_(doc_ids))
+                ).mappings().all()
+            doc_types = {r["id"]: r["doc_type"] for r in rows}
+
+        missing = [d for d in doc_ids if d not in doc_types]
+        if missing:
+            raise ValueError(f"doc_id not found in documents table: {missing}")
+
+        # découpage en sections (CPU pur, GIL) des documents TDR-like en une passe multi-processus:
+        # le cache de split_into_sections est rempli, structure_document le retrouve ensuite.
+        # Textes normalisés une seule fois ici, puis transmis à structure_document.
+        normalized: List[Optional[str]] = [None] * len(items)
+        tdr_idx = [i for i, it in enumerate(items) if (doc_types[it[0]] or "unknown").lower() not in _ROUTES]
+        if (
+            1 < len(tdr_idx) <= _BATCH_PRESPLIT_MAX
+            and (os.cpu_count() or 1) > 1
+            and sum(len(items[i][1] or "") for i in tdr_idx) >= BATCH_MIN_POOL_CHARS
+        ):
+            for i in tdr_idx:
+                normalized[i] = normalize_text(items[i][1])
+            # simple préchauffage du cache: en cas d'échec (pool cassé, import dans un worker),
+            # chaque document est découpé dans son propre thread comme sans pré-découpage
+            try:
+                batch_structure([normalized[i] for i in tdr_idx])
+            except Exception as e:
+                log.warning(f"[STRUCTURE] batch pre-split failed, continuing without it: {type(e).__name__}: {e}")
+
+        client = get_minio_client()
+
+        # pool dédié au lot (documents traités en parallèle)
+        with ThreadPoolExecutor(max_workers=min(_BATCH_MAX_WORKERS, len(items))) as ex:
+            futs = [
+                submit_in_context(
+                    ex,
+                    structure_document,
+                    doc_id=doc_id,
+                    extracted_text=extracted_text,
+                    processed_prefix=processed_prefix,
+                    extracted_markdown=extracted_markdown,
+                    processed_bucket=processed_bucket,
+                    doc_type=doc_types[doc_id] or "unknown",
+                    minio_client=client,
+                    normalized=norm,
+                )
+                for (doc_id, extracted_text, processed_prefix, extracted_markdown, processed_bucket), norm
+                in zip(items, normalized)
+            ]
+            return [f.result() for f in futs]
@@ -1,10 +1,20 @@
 # backend/app/services/structuring_service.py
 from __future__ import annotations
 
+import multiprocessing
+import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Optional, Any
 
 from app.services.tracing import span_step
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.text_cache import TextLRU, text_key
 
 
 # -------------------------------------------------------------------
@@ -27,10 +37,50 @@ SKILL_KEYWORDS = [
     "banque mondiale", "bird", "vbg",
 ]
 
+SKILL_MATCHER = KeywordMatcher(kw.lower() for kw in SKILL_KEYWORDS)
+
 
 # -------------------------------------------------------------------
 # OCR / normalisation
 # -------------------------------------------------------------------
+def _char_range(first: str, last: str) -> List[str]:
+    return [chr(c) for c in range(ord(first), ord(last) + 1)]
+
+
+# mêmes classes que [A-Za-zÀ-ÿ] / [A-ZÀ-ÖØ-Ý] (pas str.isalpha / str.isupper)
+_LETTER_CHARS = frozenset(_char_range("A", "Z") + _char_range("a", "z") + _char_range("À", "ÿ"))
+_UPPER_CHARS = frozenset(_char_range("A", "Z") + _char_range("À", "Ö") + _char_range("Ø", "Ý"))
+
+
+def _space_digit_run(m: "re.Match[str]") -> str:
+    # suite de chiffres collée à une lettre: espace de ce côté (lettre->chiffre, chiffre->lettre)
+    t = m.string
+    a, b = m.span()
+    before = a > 0 and t[a - 1] in _LETTER_CHARS
+    after = b < len(t) and t[b] in _LETTER_CHARS
+    if not (before or after):
+        return m.group()
+    return (" " if before else "") + m.group() + (" " if after else "")
+
+
+# regex compilées une fois à l'import (appelées pour chaque document)
+# corrections OCR (pattern, remplacement), appliquées dans cet ordre
+_OCR_FIXES: Tuple[Tuple[re.Pattern, Any], ...] = (
+    (re.compile(r"(\d)\s*-\s*([A-Z])"), r"\1 - \2"),
+    (re.compile(r"([a-zà-ÿ])([A-ZÀ-ÖØ-Ý])"), r"\1 \2"),
+    # une passe sur les suites de chiffres (rares) au lieu de deux passes lettre/chiffre
+    (re.compile(r"\d+"), _space_digit_run),
+    (re.compile(r"\b(DE|DU|DES|DEL|D')(?=[A-ZÀ-ÖØ-Ý])"), r"\1 "),
+    (re.compile(r"[ \t]{2,}"), " "),
+)
+
+_RX_ROMAN_LINE_START = re.compile(r"(?m)^\s*(I{1,3}\.|IV\.|V\.|VI\.)")
+_RX_LETTER_DASH_LINE_START = re.compile(r"(?m)^\s*([A-Z]\-)\s*")
+_RX_HYPHEN_LINEBREAK = re.compile(r"(\w)-\n(\w)")
+_RX_BLANKS = re.compile(r"[ \t]+")
+_RX_MANY_NEWLINES = re.compile(r"\n{3,}")
+
+
 def fix_ocr_spacing(text: str) -> str:
     """
     Heuristiques légères pour corriger les textes OCR où les espaces sont collés.
@@ -38,14 +88,8 @@ def fix_ocr_spacing(text: str) -> str:
     """
     with span_step("structure.fix_ocr_spacing", in_len=len(text or "")):
         t = text or ""
-
-        t = re.sub(r"(\d)\s*-\s*([A-Z])", r"\1 - \2", t)
-        t = re.sub(r"([a-zà-ÿ])([A-ZÀ-ÖØ-Ý])", r"\1 \2", t)
-        t = re.sub(r"([A-Za-zÀ-ÿ])(\d)", r"\1 \2", t)
-        t = re.sub(r"(\d)([A-Za-zÀ-ÿ])", r"\1 \2", t)
-        t = re.sub(r"\b(DE|DU|DES|DEL|D')(?=[A-ZÀ-ÖØ-Ý])", r"\1 ", t)
-        t = re.sub(r"[ \t]{2,}", " ", t)
-
+        for rx, repl in _OCR_FIXES:
+            t = rx.sub(repl, t)
         return t
 
 
@@ -58,52 +102,52 @@ def normalize_text(text: str) -> str:
 
         t = fix_ocr_spacing(t)
         t = t.replace("▪", "\n- ").replace("●", "\n- ").replace("•", "\n- ")
-        t = re.sub(r"(?m)^\s*(I{1,3}\.|IV\.|V\.|VI\.)", r"\n\g<0>", t)
-        t = re.sub(r"(?m)^\s*([A-Z]\-)\s*", r"\n\1 ", t)
-        t = re.sub(r"(\w)-\n(\w)", r"\1\2", t)
-        t = re.sub(r"[ \t]+", " ", t)
-        t = re.sub(r"\n{3,}", "\n\n", t)
+        t = _RX_ROMAN_LINE_START.sub(r"\n\g<0>", t)
+        t = _RX_LETTER_DASH_LINE_START.sub(r"\n\1 ", t)
+        t = _RX_HYPHEN_LINEBREAK.sub(r"\1\2", t)
+        t = _RX_BLANKS.sub(" ", t)
+        t = _RX_MANY_NEWLINES.sub("\n\n", t)
 
         out = t.strip()
         span.set_attribute("out_len", len(out))
         return out
 
 
-def clean_and_dedup_tasks(tasks: List[str]) -> List[str]:
+# tâches à écarter (soumission / évaluation des offres, contacts)
+TASK_NOISE_PATTERNS = [
+    "envoi des offres",
+    "soumission des offres",
+    "@",
+    "offre technique",
+    "offre financière",
+    "critères de sélection",
+    "critères d'évaluation",
+    "proposition financière",
+    "proposition technique",
+]
+
+_TASK_NOISE_MATCHER = KeywordMatcher(TASK_NOISE_PATTERNS)
+
+
+def clean_and_dedup_tasks(tasks: List[str], normalized: bool = False) -> List[str]:
     if not tasks:
         return []
 
     with span_step("structure.clean_and_dedup_tasks", in_count=len(tasks)) as span:
-        cleaned: List[str] = []
-        seen = set()
-
-        noise_patterns = [
-            "envoi des offres",
-            "soumission des offres",
-            "@",
-            "offre technique",
-            "offre financière",
-            "critères de sélection",
-            "critères d'évaluation",
-            "proposition financière",
-            "proposition technique",
-        ]
+        # clé de dédoublonnage -> première tâche rencontrée (dict: ordre d'insertion conservé)
+        first: Dict[str, str] = {}
 
         for t in tasks:
             if not t:
                 continue
-            s = " ".join(t.split()).strip()
+            # normalized=True: espaces déjà normalisés par l'appelant (extract_tasks)
+            s = t if normalized else " ".join(t.split())
             low = s.lower()
 
-            if any(p in low for p in noise_patterns):
-                continue
-
-            key = low.replace("’", "'")
-            if key in seen:
-                continue
-            seen.add(key)
-            cleaned.append(s)
+            if not _TASK_NOISE_MATCHER.search(low):
+                first.setdefault(low.replace("’", "'"), s)
 
+        cleaned = list(first.values())
         span.set_attribute("out_count", len(cleaned))
         return cleaned
 
@@ -123,15 +167,58 @@ TITLE_WORDS = [
 ]
 
 
+_RX_ROMAN_TITLE = re.compile(r"(?<!\n)\s*([IVX]{1,6}\.)\s+")
+_RX_LETTER_TITLE = re.compile(r"(?<!\n)\s*([A-Z])\s*[-–]\s+")
+_RX_NUMBER_TITLE = re.compile(r"(?<!\n)\s*(\d{1,2})\s*[-–—]\s*([A-ZÀ-ÖØ-Ý])")
+# Tous les mots de titre en une seule alternation (plus longs d'abord).
+# Le séparateur final est en lookahead: il reste disponible comme blanc initial du mot suivant.
+# Lookahead sur la 1re lettre: après un blanc, rejet immédiat sans essayer chaque mot.
+_TITLE_WORDS_BY_LEN = sorted(TITLE_WORDS, key=len, reverse=True)
+_TITLE_WORDS_FIRST_CHARS = "".join(sorted({w[0] for w in TITLE_WORDS}))
+_TITLE_WORDS_UNION = re.compile(
+    r"(?i)(^|\s)(?=[" + re.escape(_TITLE_WORDS_FIRST_CHARS) + r"])(?:"
+    + "|".join(f"(?P<w{i}>{re.escape(w)})" for i, w in enumerate(_TITLE_WORDS_BY_LEN))
+    + r")(?=\s|:)"
+)
+# mot trouvé -> mots qui matchent aussi à la même position (lui-même + préfixes, ex: RÉSULTATS ATTENDUS)
+_TITLE_WORDS_AT_SAME_POS = [
+    [j for j, p in enumerate(_TITLE_WORDS_BY_LEN) if w == p or (w.startswith(p) and w[len(p)] in " :")]
+    for w in _TITLE_WORDS_BY_LEN
+]
+
+
+def _break_before_title_words(t: str) -> str:
+    """
+    Retour à la ligne avant chaque mot de TITLE_WORDS, en une seule passe.
+    Même résultat que l'ancien re.sub par mot (dans l'ordre de la liste): dans la
+    passe d'un mot, une occurrence dont le blanc initial était le séparateur de
+    l'occurrence précédente du même mot n'était pas coupée.
+    """
+    resume: Dict[int, int] = {}  # mot -> position de reprise de sa propre passe
+
+    def _repl(m: "re.Match[str]") -> str:
+        lead = m.start()
+        word_start = m.start(m.lastgroup)
+        cut = False
+        for j in _TITLE_WORDS_AT_SAME_POS[int(m.lastgroup[1:])]:
+            if lead >= resume.get(j, 0):
+                resume[j] = word_start + len(_TITLE_WORDS_BY_LEN[j]) + 1
+                cut = True
+        if not cut:
+            return m.group(0)
+        return "\n" + t[word_start:m.end()]
+
+    return _TITLE_WORDS_UNION.sub(_repl, t)
+
+
 def normalize_for_titles(text: str) -> str:
     with span_step("structure.normalize_for_titles", in_len=len(text or "")) as span:
         t = text or ""
-        t = re.sub(r"(?<!\n)\s*([IVX]{1,6}\.)\s+", r"\n\1 ", t)
-        t = re.sub(r"(?<!\n)\s*([A-Z])\s*[-–]\s+", r"\n\1- ", t)
-        t = re.sub(r"(?<!\n)\s*(\d{1,2})\s*[-–—]\s*([A-ZÀ-ÖØ-Ý])", r"\n\1 - \2", t)
+        t = _RX_ROMAN_TITLE.sub(r"\n\1 ", t)
+        t = _RX_LETTER_TITLE.sub(r"\n\1- ", t)
+        t = _RX_NUMBER_TITLE.sub(r"\n\1 - \2", t)
 
-        for w in TITLE_WORDS:
-            t = re.sub(rf"(?i)(^|\s)({re.escape(w)})(\s|:)", r"\n\2\3", t)
+        t = _break_before_title_words(t)
 
         span.set_attribute("out_len", len(t))
         return t
@@ -147,6 +234,22 @@ TITLE_LINE_REGEXES = [
 ]
 
 
+# une seule regex: match si l'un des motifs matche
+_TITLE_LINE_UNION = re.compile("|".join(f"(?:{rx})" for rx in TITLE_LINE_REGEXES), re.IGNORECASE)
+_RX_NUMBERED_PREFIX = re.compile(r"^\s*([IVX]{1,6}\.|(\d+(\.|[-–—]))|[A-Z]\s*[-–])\s+")
+
+
+# lettres non majuscules: lettres = majuscules + non majuscules (partition)
+_NON_UPPER_LETTER_CHARS = _LETTER_CHARS - _UPPER_CHARS
+# Toutes ces lettres sont en Latin-1: classe de chaque octet ("U" majuscule, "l" autre
+# lettre, "." le reste) pour compter en C via bytes.translate + count. Les caractères
+# hors Latin-1 (ignorés à l'encodage) ne sont de toute façon dans aucune classe.
+_LATIN1_LETTER_CLASS = bytes(
+    ord("U") if chr(i) in _UPPER_CHARS else ord("l") if chr(i) in _NON_UPPER_LETTER_CHARS else ord(".")
+    for i in range(256)
+)
+
+
 def _is_title_line(line: str) -> bool:
     s = (line or "").strip()
     if len(s) < 4:
@@ -154,22 +257,33 @@ def _is_title_line(line: str) -> bool:
     if len(s) > 140:
         return False
 
-    if len(s.split()) > 15:
-        if not re.match(r"^\s*([IVX]{1,6}\.|(\d+(\.|[-–—]))|[A-Z]\s*[-–])\s+", s):
+    # tous les motifs de titre commencent par un chiffre ou une lettre (IGNORECASE compris):
+    # sinon (puces, ponctuation...) aucun n'est essayé, seul le test de casse reste possible
+    starts_alnum = s[0].isalnum()
+
+    n_words = len(s.split())
+    if n_words > 15:
+        if not (starts_alnum and _RX_NUMBERED_PREFIX.match(s)):
             return False
 
-    for rx in TITLE_LINE_REGEXES:
-        if re.match(rx, s, flags=re.IGNORECASE):
-            return True
+    if starts_alnum and _TITLE_LINE_UNION.match(s):
+        return True
 
-    letters = re.sub(r"[^A-Za-zÀ-ÿ]", "", s)
-    if len(letters) >= 8:
-        upp = re.sub(r"[^A-ZÀ-ÖØ-Ý]", "", s)
-        ratio = len(upp) / max(1, len(letters))
-        if ratio >= 0.75 and len(s.split()) <= 14:
-            return True
+    # titre en majuscules: au plus 14 mots -> inutile de compter au-delà
+    if n_words > 14:
+        return False
 
-    return False
+    # ratio >= 0.75 <=> upp >= 3 * low, et upp <= len(s) - low: une ligne de
+    # texte courant (surtout des minuscules) est écartée dès le premier comptage.
+    classes = s.encode("latin-1", "ignore").translate(_LATIN1_LETTER_CLASS)
+    low = classes.count(b"l")
+    if 4 * low > len(s):
+        return False
+    upp = classes.count(b"U")
+    letters = upp + low
+    if letters < 8:
+        return False
+    return upp / letters >= 0.75
 
 
 TITLE_TO_SECTION = [
@@ -187,75 +301,142 @@ TITLE_TO_SECTION = [
 ]
 
 
+_RX_TITLE_SEPARATORS = re.compile(r"[\s’'’\-\–—:_]")
+_RX_PATTERN_SYNTAX = re.compile(r"\\b|\(|\)|\?|\*|\+|\||\.")
+
+
+def _pattern_token(pattern: str) -> str:
+    # forme compacte du pattern (syntaxe regex retirée), cherchée telle quelle dans le titre compact
+    token = _RX_PATTERN_SYNTAX.sub("", pattern)
+    token = token.split("|")[0]
+    return _RX_TITLE_SEPARATORS.sub("", token.lower())
+
+
+# (regex, token compact, section) dans l'ordre de priorité, calculés une fois
+_TITLE_TO_SECTION_RXS = [
+    (re.compile(p, re.IGNORECASE), _pattern_token(p), section) for p, section in TITLE_TO_SECTION
+]
+
+# tous les patterns en une alternation (groupe nommé t{i} = pattern i): une seule
+# recherche borne l'index du premier pattern qui correspond
+_TITLE_TO_SECTION_UNION = re.compile(
+    "|".join(f"(?P<t{i}>{p})" for i, (p, _) in enumerate(TITLE_TO_SECTION)),
+    re.IGNORECASE,
+)
+
+
 def _title_to_section(title: str) -> Optional[str]:
     s = (title or "").strip().lower()
     if not s:
         return None
+    return _section_for_title(s)
 
-    compact = re.sub(r"[\s’'’\-\–—:_]", "", s)
 
-    for pattern, section in TITLE_TO_SECTION:
-        if re.search(pattern, s, flags=re.IGNORECASE):
-            return section
+# les mêmes titres reviennent d'un document à l'autre ("contexte", "objectifs", ...)
+@lru_cache(maxsize=4096)
+def _section_for_title(s: str) -> Optional[str]:
+    compact = _RX_TITLE_SEPARATORS.sub("", s)
+
+    # la recherche fusionnée renvoie la correspondance la plus à gauche, pas forcément
+    # le pattern le plus prioritaire: seuls les patterns précédents restent à tester
+    m = _TITLE_TO_SECTION_UNION.search(s)
+    stop = int(m.lastgroup[1:]) if m else len(_TITLE_TO_SECTION_RXS)
 
-        token = re.sub(r"\\b|\(|\)|\?|\*|\+|\||\.", "", pattern)
-        token = token.split("|")[0]
-        token_compact = re.sub(r"[\s’'’\-\–—:_]", "", token.lower())
-        if token_compact and token_compact in compact:
+    for rx, token, section in _TITLE_TO_SECTION_RXS[:stop]:
+        if (token and token in compact) or rx.search(s):
             return section
 
-    return None
+    return _TITLE_TO_SECTION_RXS[stop][2] if m else None
 
 
 # -------------------------------------------------------------------
 # Window fallback scoring
 # -------------------------------------------------------------------
-def _window_extract(text: str, keywords: List[str], window: int = 2500) -> str:
-    lower = (text or "").lower()
-    positions: List[int] = []
-
-    compact = lower.replace(" ", "")
-    for k in keywords:
-        k1 = k.lower()
-        k2 = k1.replace(" ", "")
-        p1 = lower.find(k1)
-        p2 = compact.find(k2)
-
-        if p1 != -1:
-            positions.append(p1)
-        if p2 != -1:
-            positions.append(max(p2 - 50, 0))
-
-    if not positions:
-        return ""
+@dataclass(frozen=True)
+class CompactText:
+    """Texte + forme compacte (minuscules sans espaces), calculée une fois par document."""
+    text: str
+    compact: str
+
+    @classmethod
+    def of(cls, text: str, lower: Optional[str] = None) -> "CompactText":
+        t = text or ""
+        # les minuscules ne servent qu'à construire la forme compacte: pas conservées
+        # lower: text.lower() déjà calculé par l'appelant (sinon calculé ici)
+        if lower is None:
+            lower = t.lower()
+        return cls(text=t, compact=lower.replace(" ", ""))
+
+
+# Les listes de mots-clés sont des constantes: formes compactes et automates
+# construits une fois par liste.
+@lru_cache(maxsize=256)
+def _compact_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(k.lower().replace(" ", "") for k in keywords)
+
+
+@lru_cache(maxsize=256)
+def _window_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(_compact_keywords(keywords))
+
 
-    start = max(min(positions) - 400, 0)
+@lru_cache(maxsize=256)
+def _presence_matcher(keywords: Tuple[str, ...]) -> Tuple[KeywordMatcher, Counter]:
+    # "k in low" implique "k sans espaces in low sans espaces": la forme compacte suffit
+    compact = _compact_keywords(keywords)
+    return KeywordMatcher(compact), Counter(compact)
+
+
+def _count_present(keywords: List[str], low_compact: str) -> int:
+    matcher, counts = _presence_matcher(tuple(keywords))
+    return sum(counts[k] for k in matcher.found(low_compact))
+
+
+def _window_start(compact_pos: int) -> int:
+    return max(compact_pos - 50 - 400, 0)
+
+
+def _window_at(text: str, start: int, window: int) -> str:
     end = min(start + window, len(text))
     return (text[start:end] or "").strip()
 
 
+def _window_extract(
+    doc: CompactText,
+    keywords: List[str],
+    window: int = 2500,
+    first_pos: Optional[Dict[str, int]] = None,
+) -> str:
+    # Seule la recherche sur la forme compacte est nécessaire: une occurrence en position p
+    # dans le texte en minuscules existe aussi dans la forme compacte à une position <= p,
+    # donc max(p_compact - 50, 0) <= p et c'est toujours ce point qui fixe le début.
+    # first_pos: premières positions (forme compacte) déjà calculées pour ces mots-clés
+    if first_pos is not None:
+        p = min((first_pos[k] for k in _compact_keywords(tuple(keywords)) if k in first_pos), default=-1)
+    else:
+        p = _window_matcher(tuple(keywords)).first_start(doc.compact)
+    if p == -1:
+        return ""
+    return _window_at(doc.text, _window_start(p), window)
+
+
+_RX_BULLET_LINE = re.compile(r"(?m)^\s*[-•▪]\s+\S+")
+_RX_EVAL_TERMS = re.compile(r"(?i)\b(offre\s+technique|offre\s+financi|proposition\s+technique|proposition\s+financi|notation|bar[eè]me|pond[eé]ration)\b")
+
+
 def _score_window(window_text: str, include: List[str], exclude: List[str]) -> int:
     if not window_text:
         return -10_000
-    low = window_text.lower()
+    low_compact = window_text.lower().replace(" ", "")
 
-    inc = 0
-    for k in include:
-        k1 = k.lower()
-        if k1 in low or k1.replace(" ", "") in low.replace(" ", ""):
-            inc += 2
-
-    exc = 0
-    for k in exclude:
-        k1 = k.lower()
-        if k1 in low or k1.replace(" ", "") in low.replace(" ", ""):
-            exc += 3
+    inc = 2 * _count_present(include, low_compact)
+    exc = 3 * _count_present(exclude, low_compact) if exclude else 0
 
     bonus = 0
-    if re.search(r"(?m)^\s*[-•▪]\s+\S+", window_text):
+    if _RX_BULLET_LINE.search(window_text):
         bonus += 2
 
-    if re.search(r"(?i)\b(offre\s+technique|offre\s+financi|proposition\s+technique|proposition\s+financi|notation|bar[eè]me|pond[eé]ration)\b", window_text):
+    if _RX_EVAL_TERMS.search(window_text):
         bonus += 1
 
     if len(window_text.strip()) < 120:
@@ -264,17 +445,35 @@ def _score_window(window_text: str, include: List[str], exclude: List[str]) -> i
     return inc + bonus - exc
 
 
-def _best_window(text: str, include: List[str], exclude: Optional[List[str]] = None, window: int = 2500) -> str:
+def _best_window(
+    doc: CompactText,
+    include: List[str],
+    exclude: Optional[List[str]] = None,
+    window: int = 2500,
+    first_pos: Optional[Dict[str, int]] = None,
+) -> str:
+    """first_pos: premières positions des mots-clés (forme compacte), sinon cherchées ici."""
     exclude = exclude or []
     candidates: List[str] = []
 
-    for k in include[:12]:
-        w = _window_extract(text, [k], window=window)
+    # Une fenêtre par début distinct: des mots-clés voisins ("livrable" / "livrables")
+    # donnent la même fenêtre, extraite et scorée une seule fois (même résultat:
+    # à score égal, la première fenêtre gagne).
+    starts = set()
+    for k2 in _compact_keywords(tuple(include[:12])):
+        p = first_pos.get(k2, -1) if first_pos is not None else doc.compact.find(k2)
+        if p == -1:
+            continue
+        start = _window_start(p)
+        if start in starts:
+            continue
+        starts.add(start)
+        w = _window_at(doc.text, start, window)
         if w:
             candidates.append(w)
 
     if not candidates:
-        w = _window_extract(text, include, window=window)
+        w = _window_extract(doc, include, window=window, first_pos=first_pos)
         return w or ""
 
     best = ""
@@ -287,124 +486,219 @@ def _best_window(text: str, include: List[str], exclude: Optional[List[str]] = N
     return best
 
 
+# Fallback: mots-clés par section (inclus / exclus), construits une seule fois
+_FALLBACK_KW: Dict[str, Tuple[str, ...]] = {
+    "contexte": ("contexte", "background", "justification", "introduction", "présentation", "presentation", "cadre", "contexte général"),
+    "mission": ("mission", "objectifs", "objectif", "description", "prestations", "mandat", "scope of work", "terms of reference", "termes de référence", "méthodologie", "methodologie", "approche", "résultats", "resultats"),
+    "taches": ("tâches", "taches", "tasks", "activités", "activites", "activities", "responsabilités", "responsabilites", "rôles", "roles"),
+    "livrables": ("livrables", "livrable", "deliverable", "deliverables", "outputs", "produits attendus", "documents à remettre", "remise des livrables", "rapport final", "rapport analytique", "policy brief", "feuille de route"),
+    "planning": ("planning", "calendrier", "timeline", "chronogramme", "durée", "duree", "date", "dates", "délai", "delai"),
+    "profil": ("profil", "qualifications", "qualification", "profile", "expérience", "experience", "formation", "diplôme", "diplome", "compétences requises", "competences requises", "prérequis", "prerequis", "requirements", "required qualifications"),
+    "competences": ("compétences", "competences", "skills", "expertise", "mots-clés", "mots cles"),
+    "evaluation": ("critères d'évaluation", "critères", "criteres", "grille d'évaluation", "notation", "barème", "bareme", "pondération", "ponderation", "proposition technique", "proposition financière", "proposition financiere", "offre technique", "offre financière", "offre financiere", "sélection", "selection", "analyse des dossiers"),
+    "candidature": ("dossier à soumettre", "dossier a soumettre", "pièces à fournir", "pieces a fournir", "soumission", "candidature", "postuler", "modalités de soumission", "adresse", "email", "e-mail", "courrier électronique", "courrier electronique", "dernier délai", "dernier delai", "date limite", "deadline", "contact"),
+}
+
+_FALLBACK_EX: Dict[str, Tuple[str, ...]] = {
+    "livrables": ("notation", "barème", "bareme", "pondération", "ponderation", "proposition financière", "offre financière", "critères d'évaluation"),
+    "profil": ("proposition financière", "offre financière", "pondération", "barème", "notation"),
+    "mission": ("dossier à soumettre", "soumission", "postuler", "adresse e-mail", "deadline", "date limite"),
+    "planning": ("pondération", "barème", "notation", "proposition technique", "proposition financière"),
+}
+
+# matchers construits à l'import: aucun coût de construction au premier document
+for _kws in _FALLBACK_KW.values():
+    _window_matcher(_kws)
+    _presence_matcher(_kws)
+for _kws in _FALLBACK_EX.values():
+    _presence_matcher(_kws)
+del _kws
+
+
+# Mots-clés de toutes les sections manquantes dans un seul automate: une passe sur le
+# texte au lieu d'une recherche par mot-clé et par section.
+@lru_cache(maxsize=64)
+def _fallback_matcher(keys: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(k for key in keys for k in _compact_keywords(_FALLBACK_KW[key]))
+
+
 def fill_empty_sections_fallback(text: str, sections: Dict[str, str]) -> Dict[str, str]:
     t = text or ""
     if not t.strip():
         return sections
 
     with span_step("structure.fill_empty_sections_fallback"):
-        KW = {
-            "contexte": ["contexte", "background", "justification", "introduction", "présentation", "presentation", "cadre", "contexte général"],
-            "mission": ["mission", "objectifs", "objectif", "description", "prestations", "mandat", "scope of work", "terms of reference", "termes de référence", "méthodologie", "methodologie", "approche", "résultats", "resultats"],
-            "taches": ["tâches", "taches", "tasks", "activités", "activites", "activities", "responsabilités", "responsabilites", "rôles", "roles"],
-            "livrables": ["livrables", "livrable", "deliverable", "deliverables", "outputs", "produits attendus", "documents à remettre", "remise des livrables", "rapport final", "rapport analytique", "policy brief", "feuille de route"],
-            "planning": ["planning", "calendrier", "timeline", "chronogramme", "durée", "duree", "date", "dates", "délai", "delai"],
-            "profil": ["profil", "qualifications", "qualification", "profile", "expérience", "experience", "formation", "diplôme", "diplome", "compétences requises", "competences requises", "prérequis", "prerequis", "requirements", "required qualifications"],
-            "competences": ["compétences", "competences", "skills", "expertise", "mots-clés", "mots cles"],
-            "evaluation": ["critères d'évaluation", "critères", "criteres", "grille d'évaluation", "notation", "barème", "bareme", "pondération", "ponderation", "proposition technique", "proposition financière", "proposition financiere", "offre technique", "offre financière", "offre financiere", "sélection", "selection", "analyse des dossiers"],
-            "candidature": ["dossier à soumettre", "dossier a soumettre", "pièces à fournir", "pieces a fournir", "soumission", "candidature", "postuler", "modalités de soumission", "adresse", "email", "e-mail", "courrier électronique", "courrier electronique", "dernier délai", "dernier delai", "date limite", "deadline", "contact"],
-        }
-
-        EX = {
-            "livrables": ["notation", "barème", "bareme", "pondération", "ponderation", "proposition financière", "offre financière", "critères d'évaluation"],
-            "profil": ["proposition financière", "offre financière", "pondération", "barème", "notation"],
-            "mission": ["dossier à soumettre", "soumission", "postuler", "adresse e-mail", "deadline", "date limite"],
-            "planning": ["pondération", "barème", "notation", "proposition technique", "proposition financière"],
-        }
+        # minuscules / forme compacte calculées une seule fois pour toutes les fenêtres
+        doc = CompactText.of(t)
+
+        # (section, fenêtre, exclusions) dans l'ordre historique de remplissage
+        plan = [
+            ("contexte", 2600, None),
+            ("candidature", 2400, None),
+            ("evaluation", 2600, None),
+            ("livrables", 3000, _FALLBACK_EX["livrables"]),
+            ("planning", 2400, _FALLBACK_EX["planning"]),
+            ("profil", 2800, _FALLBACK_EX["profil"]),
+            ("taches", 2800, None),
+            ("mission", 3200, _FALLBACK_EX["mission"]),
+            ("competences", 1800, None),
+        ]
+        todo = [(k, w, ex) for k, w, ex in plan if not (sections.get(k) or "").strip()]
+        if not todo:
+            return sections
 
-        if not (sections.get("contexte") or "").strip():
-            sections["contexte"] = _best_window(t, KW["contexte"], window=2600)
+        # premières positions de tous les mots-clés des sections manquantes, en une passe
+        first_pos = _fallback_matcher(tuple(k for k, _, _ in todo)).first_starts(doc.compact)
 
-        if not (sections.get("candidature") or "").strip():
-            sections["candidature"] = _best_window(t, KW["candidature"], window=2400)
+        # affectation dans l'ordre du plan (ordre des clés du dict inchangé)
+        for k, w, ex in todo:
+            sections[k] = _best_window(doc, _FALLBACK_KW[k], exclude=ex, window=w, first_pos=first_pos)
 
-        if not (sections.get("evaluation") or "").strip():
-            sections["evaluation"] = _best_window(t, KW["evaluation"], window=2600)
+        return sections
 
-        if not (sections.get("livrables") or "").strip():
-            sections["livrables"] = _best_window(t, KW["livrables"], exclude=EX["livrables"], window=3000)
 
-        if not (sections.get("planning") or "").strip():
-            sections["planning"] = _best_window(t, KW["planning"], exclude=EX["planning"], window=2400)
+# -------------------------------------------------------------------
+# Split par titres (avec sections enrichies)
+# -------------------------------------------------------------------
+# Clés de sections (ordre = ordre dans le JSON structuré)
+SECTION_KEYS = (
+    "contexte",
+    "mission",
+    "taches",
+    "livrables",
+    "planning",
+    "profil",
+    "competences",
+    "evaluation",
+    "candidature",
+    "taches_table",
+)
 
-        if not (sections.get("profil") or "").strip():
-            sections["profil"] = _best_window(t, KW["profil"], exclude=EX["profil"], window=2800)
 
-        if not (sections.get("taches") or "").strip():
-            sections["taches"] = _best_window(t, KW["taches"], window=2800)
+# séparateurs de lignes de str.splitlines() autres que "\n"
+_RX_OTHER_LINE_BREAKS = re.compile("[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
 
-        if not (sections.get("mission") or "").strip():
-            sections["mission"] = _best_window(t, KW["mission"], exclude=EX["mission"], window=3200)
 
-        if not (sections.get("competences") or "").strip():
-            sections["competences"] = _best_window(t, KW["competences"], window=1800)
+# Même texte -> mêmes sections (retries, relances pipeline): résultats en cache,
+# figés (MappingProxyType) et copiés à la sortie.
+_SECTIONS_CACHE = TextLRU(maxsize=128)
 
-        return sections
+
+def split_into_sections(text: str) -> Dict[str, str]:
+    with span_step("structure.split_into_sections", in_len=len(text or "")) as span:
+        sections, hit = _SECTIONS_CACHE.get_or_compute(
+            text_key(text),
+            lambda: MappingProxyType(_split_into_sections(text, span)),
+        )
+        span.set_attribute("cache_hit", hit)
+        # copie: les appelants (enrich, procurement) modifient le dict
+        return dict(sections)
+
+
+def _split_into_sections(text: str, span: Any) -> Dict[str, str]:
+    text = normalize_text(text)
+    text = normalize_for_titles(text)
+
+    lines = text.splitlines()
+    # len(line) <= 3 => jamais un titre (< 4 caractères une fois strippée): lignes vides,
+    # numéros de page... écartées sans appel de fonction
+    title_spans: List[Tuple[int, str]] = [
+        (i, line.strip()) for i, line in enumerate(lines) if len(line) > 3 and _is_title_line(line)
+    ]
+
+    out: Dict[str, str] = dict.fromkeys(SECTION_KEYS, "")
+
+    if not title_spans:
+        del lines  # libérée avant le fallback (qui alloue ses propres copies du texte)
+        out["mission"] = text.strip()
+        out2 = fill_empty_sections_fallback(text, out)
+        span.set_attribute("titles.count", 0)
+        return out2
+
+    span.set_attribute("titles.count", len(title_spans))
+
+    # blocs = tranches du texte (lignes jointes par "\n"), sans re-joindre les lignes:
+    # starts[i] = début de la ligne i
+    body = "\n".join(lines) if _RX_OTHER_LINE_BREAKS.search(text) else text
+    starts = [0, *accumulate(len(line) + 1 for line in lines)]
+    n_lines = len(lines)
+    del lines  # seuls les offsets servent désormais: liste libérée avant le fallback
+
+    for idx, (start_i, title) in enumerate(title_spans):
+        end_i = title_spans[idx + 1][0] if idx + 1 < len(title_spans) else n_lines
+        block = body[starts[start_i + 1]:starts[end_i]].strip()
+
+        section = _title_to_section(title)
+        if section:
+            if out.get(section):
+                out[section] = (out[section] + "\n\n" + block).strip()
+            else:
+                out[section] = block
+
+    out = fill_empty_sections_fallback(text, out)
+    return out
 
 
 # -------------------------------------------------------------------
-# Split par titres (avec sections enrichies)
+# Découpage par lot (processus séparés: pas de GIL)
 # -------------------------------------------------------------------
-def split_into_sections(text: str) -> Dict[str, str]:
-    with span_step("structure.split_into_sections", in_len=len(text or "")) as span:
-        text = normalize_text(text)
-        text = normalize_for_titles(text)
-
-        lines = text.splitlines()
-        title_spans: List[Tuple[int, str]] = []
-
-        for i, line in enumerate(lines):
-            if _is_title_line(line):
-                title_spans.append((i, line.strip()))
-
-        out: Dict[str, str] = {
-            "contexte": "",
-            "mission": "",
-            "taches": "",
-            "livrables": "",
-            "planning": "",
-            "profil": "",
-            "competences": "",
-            "evaluation": "",
-            "candidature": "",
-            "taches_table": "",
-        }
-
-        if not title_spans:
-            out["mission"] = text.strip()
-            out2 = fill_empty_sections_fallback(text, out)
-            span.set_attribute("titles.count", 0)
-            return out2
-
-        span.set_attribute("titles.count", len(title_spans))
-
-        for idx, (start_i, title) in enumerate(title_spans):
-            end_i = title_spans[idx + 1][0] if idx + 1 < len(title_spans) else len(lines)
-            block = "\n".join(lines[start_i + 1:end_i]).strip()
-
-            section = _title_to_section(title)
-            if section:
-                if out.get(section):
-                    out[section] = (out[section] + "\n\n" + block).strip()
-                else:
-                    out[section] = block
-
-        out = fill_empty_sections_fallback(text, out)
-        return out
+# Pas de fork: le processus parent a déjà des threads (serveur, OTel, pools) et un verrou
+# tenu au moment du fork (cache, métriques) resterait verrouillé dans le worker.
+# forkserver si disponible (Linux), sinon spawn (Windows, macOS).
+_BATCH_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# En dessous (caractères à découper au total), séquentiel dans le processus courant.
+# Mesuré: ~1 ms par millier de caractères en séquentiel; démarrage d'un pool (forkserver,
+# 2-4 workers) ~0.25 s avec un tracing minimal, davantage avec les imports OTel/Prometheus
+# (~1 s). Avec 2 workers, le gain (moitié du temps séquentiel) ne couvre ce coût qu'à
+# partir de ~2 millions de caractères.
+BATCH_MIN_POOL_CHARS = 2_000_000
+
+
+def batch_structure(texts: List[str], workers: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    split_into_sections sur un lot de textes (résultats dans l'ordre des textes).
+    workers: nombre de processus (défaut: nombre de CPU); 1 => séquentiel, dans le processus courant.
+    Séquentiel aussi si le lot est trop petit pour amortir le démarrage du pool (BATCH_MIN_POOL_CHARS).
+    Partage le cache de split_into_sections: seuls les textes absents (dédoublonnés) partent
+    dans les workers, et leurs résultats y sont ajoutés (un appel ensuite par document = hit).
+    """
+    if not texts:
+        return []
+
+    keys = [text_key(t) for t in texts]
+    found = {k: _SECTIONS_CACHE.get(k) for k in dict.fromkeys(keys)}
+    todo = {k: t for k, t in zip(keys, texts) if found[k] is None}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo) or 1))
+    if sum(len(t or "") for t in todo.values()) < BATCH_MIN_POOL_CHARS:
+        workers = 1
+
+    with span_step("structure.batch_structure", batch_size=len(texts), todo=len(todo), workers=workers):
+        if workers == 1:
+            return [split_into_sections(t) for t in texts]
+
+        chunksize = max(1, len(todo) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_BATCH_MP_CONTEXT) as pool:
+            for k, sections in zip(todo, pool.map(split_into_sections, todo.values(), chunksize=chunksize)):
+                found[k] = MappingProxyType(sections)
+                _SECTIONS_CACHE.put(k, found[k])
+
+        # copies: même contrat que split_into_sections (dict modifiable par l'appelant)
+        return [dict(found[k]) for k in keys]
 
 
 # -------------------------------------------------------------------
 # Extraction compétences
 # -------------------------------------------------------------------
-def extract_skills_from_text(text: str) -> List[str]:
+def extract_skills_from_text(text: str, lower: Optional[str] = None) -> List[str]:
+    """lower: text.lower() déjà calculé par l'appelant (évite une copie du document)."""
     with span_step("structure.extract_skills", in_len=len(text or "")) as span:
-        lower = (text or "").lower()
-        found: List[str] = []
-        for kw in SKILL_KEYWORDS:
-            if kw.lower() in lower:
-                found.append(kw.lower())
-
-        out = sorted(set(found))
+        if lower is None:
+            lower = (text or "").lower()
+        out = sorted(SKILL_MATCHER.found(lower))
         span.set_attribute("skills.count", len(out))
         return out
 
@@ -416,42 +710,38 @@ def extract_competences(text: str, max_items: int = 40) -> List[str]:
 # -------------------------------------------------------------------
 # Extraction tâches
 # -------------------------------------------------------------------
+_RX_TASK_BULLET = re.compile(r"^\s*[▪•\-–]\s+(.+)")
+_RX_TASK_VERB = re.compile(r"(?i)^(assurer|réaliser|realiser|mettre|appuyer|participer|élaborer|elaborer|produire|préparer|preparer|organiser|conduire|suivre|analyser|contrôler|controler|former|sensibiliser)\b")
+
+
 def extract_tasks(text: str, max_items: int = 30) -> List[str]:
     if not text:
         return []
 
     with span_step("structure.extract_tasks", in_len=len(text or ""), max_items=max_items) as span:
-        tasks: List[str] = []
-        seen = set()
-
-        lines = (text or "").splitlines()
-        for raw in lines:
-            line = (raw or "").strip()
-            if not line:
-                continue
-
-            if re.match(r"^\s*[▪•\-–]\s+.+", raw):
-                item = re.sub(r"^\s*[▪•\-–]\s+", "", raw).strip()
-                item = re.sub(r"\s+", " ", item).strip()
+        # clé (minuscules) -> première occurrence, dans l'ordre du texte
+        first: Dict[str, str] = {}
+
+        for raw in text.splitlines():
+            # la regex absorbe les blancs initiaux: pas de strip pour les puces
+            m = _RX_TASK_BULLET.match(raw)
+            if m:
+                item = " ".join(m.group(1).split())
                 if len(item) >= 25:
-                    k = item.lower()
-                    if k not in seen:
-                        seen.add(k)
-                        tasks.append(item)
+                    first.setdefault(item.lower(), item)
                 continue
 
-            if len(line) >= 60 and (line.endswith(";") or line.endswith(".") or line.endswith(":")):
-                if re.match(r"(?i)^(assurer|réaliser|realiser|mettre|appuyer|participer|élaborer|elaborer|produire|préparer|preparer|organiser|conduire|suivre|analyser|contrôler|controler|former|sensibiliser)\b", line):
-                    item = re.sub(r"\s+", " ", line).strip()
-                    k = item.lower()
-                    if k not in seen:
-                        seen.add(k)
-                        tasks.append(item)
+            # lignes vides écartées par le test de longueur
+            line = raw.strip()
+            if len(line) >= 60 and line.endswith((";", ".", ":")):
+                if _RX_TASK_VERB.match(line):
+                    item = " ".join(line.split())
+                    first.setdefault(item.lower(), item)
 
-            if len(tasks) >= max_items:
+            if len(first) >= max_items:
                 break
 
-        out = clean_and_dedup_tasks(tasks[:max_items])
+        out = clean_and_dedup_tasks(list(first.values())[:max_items], normalized=True)
         span.set_attribute("tasks.count", len(out))
         return out
 
@@ -459,11 +749,19 @@ def extract_tasks(text: str, max_items: int = 30) -> List[str]:
 # -------------------------------------------------------------------
 # Procurement fallback (conservé)
 # -------------------------------------------------------------------
-def procurement_fallback(text: str, sections: Dict[str, str], tasks: List[str]) -> Dict[str, str]:
+def procurement_fallback(
+    text: str,
+    sections: Dict[str, str],
+    tasks: List[str],
+    lower: Optional[str] = None,
+) -> Dict[str, str]:
+    """lower: text.lower() déjà calculé par l'appelant (optionnel)."""
     with span_step("structure.procurement_fallback"):
+        doc = CompactText.of(text, lower)
+
         if not (sections.get("profil") or "").strip():
             prof = _window_extract(
-                text,
+                doc,
                 [
                     "l’équipe d’exécution", "l'equipe d'execution", "doit comprendre", "profil",
                     "qualification", "compétences requises", "competences requises",
@@ -484,7 +782,7 @@ def procurement_fallback(text: str, sections: Dict[str, str], tasks: List[str])
 
         if not (sections.get("livrables") or "").strip():
             liv = _window_extract(
-                text,
+                doc,
                 ["livrable", "deliverable", "rapport", "rapports", "planning", "calendrier", "outputs"],
                 window=1800,
             )
@@ -493,7 +791,7 @@ def procurement_fallback(text: str, sections: Dict[str, str], tasks: List[str])
 
         if not (sections.get("contexte") or "").strip():
             ctx = _window_extract(
-                text,
+                doc,
                 ["contexte", "introduction", "justification", "présentation", "presentation", "objet", "organisation"],
                 window=2500,
             )
@@ -505,35 +803,66 @@ def procurement_fallback(text: str, sections: Dict[str, str], tasks: List[str])
 # -------------------------------------------------------------------
 # Markdown tables enrichment
 # -------------------------------------------------------------------
+_RX_HEADER_QUOTES = re.compile(r"[’'`]")
+_RX_HEADER_NON_WORD = re.compile(r"[^a-z0-9à-ÿ]+")
+_RX_WHITESPACE = re.compile(r"\s+")
+
+
+def _split_cells(line: str) -> List[str]:
+    return list(filter(None, map(str.strip, line.split("|"))))
+
+
 def extract_markdown_tables(md: str) -> List[Dict[str, Any]]:
     tables: List[Dict[str, Any]] = []
     if not md:
         return tables
 
     with span_step("structure.extract_markdown_tables", md_len=len(md or "")) as span:
-        lines = md.splitlines()
-        i = 0
-        while i < len(lines) - 2:
-            header = lines[i].strip()
-            sep = lines[i + 1].strip()
-
-            is_table_header = ("|" in header) and ("|" in sep) and bool(re.search(r"-{3,}", sep))
-            if not is_table_header:
-                i += 1
+        # pas de séparateur possible -> aucune table, sans découper le document
+        if "|" not in md or "---" not in md:
+            span.set_attribute("tables.count", 0)
+            return tables
+
+        # parcours par positions (find), sans liste de toutes les lignes.
+        # Même découpage que splitlines(): autres sauts de ligne ramenés à "\n" si présents.
+        if _RX_OTHER_LINE_BREAKS.search(md):
+            md = "\n".join(md.splitlines())
+        n = len(md)
+
+        consumed = 0  # début de la première ligne non consommée par une table précédente
+        pos = md.find("---")
+        while pos != -1:
+            # seules les lignes séparateur (| et ---) peuvent ouvrir une table: en-tête = ligne précédente
+            sep_start = md.rfind("\n", 0, pos) + 1
+            sep_end = md.find("\n", pos)
+            if sep_end == -1:
+                sep_end = n
+            pos = md.find("---", sep_end)
+
+            if sep_start == 0 or "|" not in md[sep_start:sep_end]:
+                continue
+            head_start = md.rfind("\n", 0, sep_start - 1) + 1
+            if head_start < consumed:
+                continue
+            header_line = md[head_start:sep_start - 1]
+            if "|" not in header_line:
                 continue
 
-            headers = [h.strip() for h in header.split("|") if h.strip()]
-            i += 2
+            headers = _split_cells(header_line)
 
             rows: List[Dict[str, str]] = []
-            while i < len(lines):
-                row_line = lines[i].strip()
+            consumed = sep_end + 1
+            while consumed < n:
+                row_end = md.find("\n", consumed)
+                if row_end == -1:
+                    row_end = n
+                row_line = md[consumed:row_end]
                 if "|" not in row_line:
                     break
-                cells = [c.strip() for c in row_line.split("|") if c.strip()]
+                cells = _split_cells(row_line)
                 if headers and len(cells) == len(headers):
                     rows.append(dict(zip(headers, cells)))
-                i += 1
+                consumed = row_end + 1
 
             if headers and rows:
                 tables.append({"headers": headers, "rows": rows})
@@ -544,9 +873,9 @@ def extract_markdown_tables(md: str) -> List[Dict[str, Any]]:
 
 def _norm_header(s: str) -> str:
     s = (s or "").lower()
-    s = re.sub(r"[’'`]", "'", s)
-    s = re.sub(r"[^a-z0-9à-ÿ]+", " ", s)
-    return re.sub(r"\s+", " ", s).strip()
+    s = _RX_HEADER_QUOTES.sub("'", s)
+    s = _RX_HEADER_NON_WORD.sub(" ", s)
+    return _RX_WHITESPACE.sub(" ", s).strip()
 
 
 def _table_signature(headers: List[str]) -> str:
@@ -654,8 +983,11 @@ def enrich_sections_from_markdown_tables(sections: Dict[str, str], markdown: str
 
 
 __all__ = [
+    "SECTION_KEYS",
     "normalize_text",
     "split_into_sections",
+    "batch_structure",
+    "BATCH_MIN_POOL_CHARS",
     "extract_tasks",
     "extract_competences",
     "extract_skills_from_text",
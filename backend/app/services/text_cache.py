@@ -0,0 +1,63 @@
+# backend/app/services/text_cache.py
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+
+def text_key(*parts: str) -> str:
+    """
+    Hash court (blake2b, 16 octets) d'un ou plusieurs textes.
+    On ne garde pas les textes complets en mémoire comme clés; chaque partie est
+    préfixée par sa taille (("ab", "c") et ("a", "bc") ont des clés différentes).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        data = (part or "").encode("utf-8", errors="surrogatepass")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class TextLRU:
+    """
+    Cache LRU borné et thread-safe (re-structuration du même texte: retries, relances pipeline).
+    Les valeurs sont partagées entre appels: stocker des valeurs immuables ou renvoyer des copies.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """Valeur en cache, None sinon (ne pas stocker None)."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(valeur, hit). compute() tourne hors verrou: deux calculs concurrents du même texte sont possibles."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key], True
+
+        value = compute()
+        self.put(key, value)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
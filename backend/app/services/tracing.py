@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 import time
+import contextvars
+from concurrent.futures import Executor, Future
 from contextlib import contextmanager
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
@@ -12,6 +14,34 @@ from app.services.metrics_service import PIPELINE_STEP_TOTAL, PIPELINE_STEP_DURA
 
 tracer = trace.get_tracer("pipeline")
 
+_STEP_RESULTS = ("success", "error")
+
+# (step, result) -> (compteur, histogramme) déjà liés aux labels:
+# évite la résolution .labels(...) à chaque span
+_STEP_METRICS: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+
+
+def _step_metrics(step: str, result: str) -> Tuple[Any, Any]:
+    children = _STEP_METRICS.get((step, result))
+    if children is None:
+        # course possible entre threads: .labels() renvoie le même enfant, sans effet
+        children = (
+            PIPELINE_STEP_TOTAL.labels(step=step, result=result),
+            PIPELINE_STEP_DURATION.labels(step=step, result=result),
+        )
+        _STEP_METRICS[(step, result)] = children
+    return children
+
+
+def register_step(*steps: str) -> None:
+    """
+    Lie à l'avance les métriques des étapes connues (séries exposées à 0 dès le démarrage).
+    Optionnel: span_step lie les autres étapes à leur première exécution.
+    """
+    for step in steps:
+        for result in _STEP_RESULTS:
+            _step_metrics(step, result)
+
 
 @contextmanager
 def span_step(step: str, **attrs):
@@ -21,7 +51,8 @@ def span_step(step: str, **attrs):
         with span_step("process.extract", doc_id=doc_id):
             ...
     """
-    t0 = time.time()
+    # perf_counter: horloge monotone (pas de saut NTP), plus précise pour des durées
+    t0 = time.perf_counter()
     with tracer.start_as_current_span(step) as span:
         # attributs utiles pour filtrer dans Jaeger
         span.set_attribute("pipeline.step", step)
@@ -39,8 +70,18 @@ def span_step(step: str, **attrs):
             span.set_attribute("error", True)
             raise
         finally:
-            dur = time.time() - t0
-            PIPELINE_STEP_TOTAL.labels(step=step, result=result).inc()
-            PIPELINE_STEP_DURATION.labels(step=step, result=result).observe(dur)
+            dur = time.perf_counter() - t0
+            total, duration = _step_metrics(step, result)
+            total.inc()
+            duration.observe(dur)
             span.set_attribute("pipeline.result", result)
             span.set_attribute("pipeline.duration_s", dur)
+
+
+def submit_in_context(executor: Executor, fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    executor.submit(...) en propageant le contexte courant (span parent OTel),
+    pour que les span_step lancés dans le thread restent rattachés à la trace.
+    """
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)